@@ -9,8 +9,10 @@ Test the funcs in the custom parsers in salt.utils.configparser
 from __future__ import absolute_import
 import copy
 import errno
+import io
 import logging
 import os
+import re
 
 log = logging.getLogger(__name__)
 
@@ -23,6 +25,9 @@ import salt.utils.files
 import salt.utils.stringutils
 import salt.utils.configparser
 
+# Import 3rd-party libs
+from salt.ext.six.moves import StringIO
+
 # The user.name param here is intentionally indented with spaces instead of a
 # tab to test that we properly load a file with mixed indentation.
 ORIG_CONFIG = u'''[user]
@@ -47,6 +52,9 @@ ORIG_CONFIG = u'''[user]
 \thist = log --pretty=format:\\"%h %ad | %s%d [%an]\\" --graph --date=short
 [http]
 \tsslverify = false'''.split(u'\n')  # future lint: disable=non-unicode-string
+_ORIG_CONFIG_BYTES = salt.utils.stringutils.to_bytes(u'\n'.join(ORIG_CONFIG))
+
+_SPACEINDENT = salt.utils.configparser.GitConfigParser.SPACEINDENT
 
 
 class TestGitConfigParser(TestCase):
@@ -55,30 +63,37 @@ class TestGitConfigParser(TestCase):
     '''
     maxDiff = None
     orig_config = os.path.join(TMP, u'test_gitconfig.orig')
-    new_config = os.path.join(TMP, u'test_gitconfig.new')
     remote = u'remote "origin"'
+    _PATTERNS = {
+        u'digits': re.compile(
+            salt.utils.stringutils.to_unicode(r'\d{7,10}')  # future lint: disable=non-unicode-string
+        ),
+        u'tags': re.compile(u'tags'),
+        u'foo': re.compile(u'foo'),
+        u'heads': re.compile(u'heads'),
+    }
 
     def tearDown(self):
         del self.conf
-        try:
-            os.remove(self.new_config)
-        except OSError as exc:
-            if exc.errno != errno.ENOENT:
-                raise
+
+    @classmethod
+    def setUpClass(cls):
+        with salt.utils.files.fopen(cls.orig_config, u'wb', buffering=65536) as fp_:
+            fp_.write(_ORIG_CONFIG_BYTES)
+        # Parse the config once, each test gets its own copy of it
+        cls._template_conf = salt.utils.configparser.GitConfigParser()
+        cls._template_conf.read(cls.orig_config)
+        cls.EXPECTED_LINES = tuple(cls.fix_indent(ORIG_CONFIG))
 
     def setUp(self):
-        if not os.path.exists(self.orig_config):
-            with salt.utils.files.fopen(self.orig_config, u'wb') as fp_:
-                fp_.write(
-                    salt.utils.stringutils.to_bytes(
-                        u'\n'.join(ORIG_CONFIG)
-                    )
-                )
-        self.conf = salt.utils.configparser.GitConfigParser()
-        self.conf.read(self.orig_config)
+        # Compiled regexes cannot be deepcopied on PY2, so share the option
+        # regex with the template instead of copying it.
+        optcre = self._template_conf._optcre  # pylint: disable=protected-access
+        self.conf = copy.deepcopy(self._template_conf, {id(optcre): optcre})
 
     @classmethod
     def tearDownClass(cls):
+        del cls._template_conf
         try:
             os.remove(cls.orig_config)
         except OSError as exc:
@@ -91,23 +106,26 @@ class TestGitConfigParser(TestCase):
         Fixes the space-indented 'user' line, because when we write the config
         object to a file space indentation will be replaced by tab indentation.
         '''
-        ret = copy.copy(lines)
-        for i, _ in enumerate(ret):
-            if ret[i].startswith(salt.utils.configparser.GitConfigParser.SPACEINDENT):
-                ret[i] = ret[i].replace(salt.utils.configparser.GitConfigParser.SPACEINDENT, u'\t')
-        return ret
+        return [line.replace(_SPACEINDENT, u'\t', 1)
+                if line.startswith(_SPACEINDENT) else line
+                for line in lines]
 
-    @staticmethod
-    def get_lines(path):
-        with salt.utils.files.fopen(path, u'r') as fp_:
-            return salt.utils.stringutils.to_unicode(fp_.read()).splitlines()
+    def _write_to_memory(self, binary=False):
+        '''
+        Write the config object to an in-memory filehandle and return the
+        resulting lines.
+        '''
+        buf = io.BytesIO() if binary else StringIO()
+        # GitConfigParser.write() checks the mode to decide whether to write
+        # bytes or str.
+        buf.mode = u'wb' if binary else u'w'
+        self.conf.write(buf)
+        return salt.utils.stringutils.to_unicode(buf.getvalue()).splitlines()
 
     def _test_write(self, mode):
-        with salt.utils.files.fopen(self.new_config, mode) as fp_:
-            self.conf.write(fp_)
         self.assertEqual(
-            self.get_lines(self.new_config),
-            self.fix_indent(ORIG_CONFIG)
+            self._write_to_memory(binary=u'b' in mode),
+            list(self.EXPECTED_LINES)
         )
 
     def test_get(self):
@@ -179,13 +197,10 @@ class TestGitConfigParser(TestCase):
             self.conf.get(self.remote, u'fetch'),
             [orig_refspec, new_refspec]
         )
-        # Write the config object to a file
-        with salt.utils.files.fopen(self.new_config, 'w') as fp_:
-            self.conf.write(fp_)
-        # Confirm that the new file was written correctly
-        expected = self.fix_indent(ORIG_CONFIG)
+        # Confirm that the config object is written correctly
+        expected = list(self.EXPECTED_LINES)
         expected.insert(6, u'\tfetch = %s' % new_refspec)  # pylint: disable=string-substitution-usage-error
-        self.assertEqual(self.get_lines(self.new_config), expected)
+        self.assertEqual(self._write_to_memory(), expected)
 
     def test_remove_option(self):
         '''
@@ -221,7 +236,7 @@ class TestGitConfigParser(TestCase):
             self.conf.remove_option_regexp(
                 self.remote,
                 u'fetch',
-                salt.utils.stringutils.to_unicode(r'\d{7,10}')  # future lint: disable=non-unicode-string
+                self._PATTERNS[u'digits']
             )
         )
         # Make sure that all three values are still there (since none should
@@ -232,7 +247,7 @@ class TestGitConfigParser(TestCase):
         )
         # Remove one of the values
         self.assertTrue(
-            self.conf.remove_option_regexp(self.remote, u'fetch', u'tags'))
+            self.conf.remove_option_regexp(self.remote, u'fetch', self._PATTERNS[u'tags']))
         # Confirm that the value is gone
         self.assertEqual(
             self.conf.get(self.remote, u'fetch'),
@@ -240,12 +255,12 @@ class TestGitConfigParser(TestCase):
         )
         # Remove the other one we added earlier
         self.assertTrue(
-            self.conf.remove_option_regexp(self.remote, u'fetch', u'foo'))
+            self.conf.remove_option_regexp(self.remote, u'fetch', self._PATTERNS[u'foo']))
         # Since the option now only has one value, it should be a string
         self.assertEqual(self.conf.get(self.remote, u'fetch'), orig_refspec)
         # Remove the last remaining option
         self.assertTrue(
-            self.conf.remove_option_regexp(self.remote, u'fetch', u'heads'))
+            self.conf.remove_option_regexp(self.remote, u'fetch', self._PATTERNS[u'heads']))
         # Trying to do a get now should raise an exception
         self.assertRaises(
             salt.utils.configparser.NoOptionError,